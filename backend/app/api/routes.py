@@ -1,16 +1,16 @@
 """
 API routes for the Conversion Analyzer.
 """
+import hashlib
 import secrets
 import time
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-
-logger = logging.getLogger(__name__)
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import func
 
 from app.core.database import get_db, SessionLocal
@@ -26,115 +26,121 @@ from app.schemas.schemas import (
     ReportListItem,
     DashboardStats,
     AnalysisCriterion,
+    ReportStatus,
 )
 from app.services.scraper import WebScraper
-from app.services.analyzer import ConversionAnalyzer
+from app.services.analyzer import CATEGORY_WEIGHTS, TOTAL_WEIGHT, ConversionAnalyzer
 from app.services.ai_report_generator import generate_enhanced_report
 from app.services.industry_detector import IndustryDetector
 from app.services.pdf_generator import generate_report_pdf
 from app.core.auth import verify_admin
 
+logger = logging.getLogger(__name__)
+
 
-def generate_ai_sync(report_id: int, scraped_data: dict, analysis: dict):
+def _save_ai_sections(report_id: int, enhanced_sections: dict):
+    """
+    Merge AI-generated sections into the stored report.
+    Runs in the threadpool since the database session is synchronous.
+    """
+    db = SessionLocal()
+    try:
+        report = db.query(Report).options(undefer(Report.full_report)).filter(Report.id == report_id).first()
+        if report and report.full_report:
+            # Merge AI sections into existing report
+            full_report = dict(report.full_report)  # Make mutable copy
+
+            # Comprehensive AI sections (new format)
+            full_report["short_description"] = enhanced_sections.get("short_description", "")
+            full_report["lead_magnets_analysis"] = enhanced_sections.get("lead_magnets_analysis", "")
+            full_report["forms_analysis"] = enhanced_sections.get("forms_analysis", "")
+            full_report["cta_analysis"] = enhanced_sections.get("cta_analysis", "")
+            full_report["logical_verdict"] = enhanced_sections.get("logical_verdict", "")
+            full_report["summary_assessment"] = enhanced_sections.get("summary_assessment", "")
+            full_report["criteria_explanations"] = enhanced_sections.get("criteria_explanations", {})
+
+            # Apply AI-adjusted scores (quality-based, not just structural)
+            adjusted_scores = enhanced_sections.get("adjusted_scores", {})
+            if adjusted_scores and full_report.get("criteria_analysis"):
+                criteria_analysis = list(full_report["criteria_analysis"])
+                score_map = {
+                    "value_proposition": adjusted_scores.get("value_proposition"),
+                    "call_to_action": adjusted_scores.get("call_to_action"),
+                    "social_proof": adjusted_scores.get("social_proof"),
+                    "lead_magnets": adjusted_scores.get("lead_magnets"),
+                    "form_design": adjusted_scores.get("form_design"),
+                    "guiding_content": adjusted_scores.get("guiding_content"),
+                    "offer_structure": adjusted_scores.get("offer_structure"),
+                }
+                for i, criterion in enumerate(criteria_analysis):
+                    key = criterion.get("criterion")
+                    if key in score_map and score_map[key] is not None:
+                        try:
+                            new_score = int(score_map[key])
+                            new_score = max(1, min(5, new_score))  # Clamp 1-5
+                            criteria_analysis[i] = dict(criterion)
+                            criteria_analysis[i]["score"] = new_score
+                        except (ValueError, TypeError):
+                            pass  # Keep original score if AI returned invalid
+                full_report["criteria_analysis"] = criteria_analysis
+                # Recalculate overall score using WEIGHTED formula
+                # Viktning: value_proposition=2.0, call_to_action=1.5, lead_magnets=1.5, resten=1.0
+                weighted_sum = sum(
+                    c["score"] * CATEGORY_WEIGHTS.get(c["criterion"], 1.0)
+                    for c in criteria_analysis
+                )
+                new_overall = round(weighted_sum / TOTAL_WEIGHT, 1)
+                full_report["overall_score"] = new_overall
+                report.overall_score = new_overall  # Update Report model too
+                print(f"📊 Applied AI-adjusted scores for report {report_id}: overall {new_overall}/5 (weighted)")
+
+            # Legacy fields (backward compatibility)
+            full_report["final_hook"] = enhanced_sections.get("final_hook", "")
+            full_report["detailed_lead_magnets"] = enhanced_sections.get("detailed_lead_magnets", "")
+            full_report["detailed_forms"] = enhanced_sections.get("detailed_forms", "")
+            full_report["detailed_social_proof"] = enhanced_sections.get("detailed_social_proof", "")
+            full_report["detailed_mailto"] = enhanced_sections.get("detailed_mailto", "")
+            full_report["detailed_ungated_pdfs"] = enhanced_sections.get("detailed_ungated_pdfs", "")
+
+            full_report["ai_generated"] = True
+
+            report.full_report = full_report
+            db.commit()
+            print(f"✅ AI generation complete for report {report_id}")
+    finally:
+        db.close()
+
+
+async def generate_ai_background(
+    report_id: int,
+    scraped_data: dict,
+    analysis: dict,
+    industry: str,
+    industry_confidence: float
+):
     """
-    Generate AI-enhanced sections synchronously in a background thread.
-    This runs AFTER the HTTP response is sent to the client.
+    Generate AI-enhanced sections as a background task on the app event loop.
+    This runs AFTER the HTTP response is sent to the client, and shares the
+    pooled async Claude client instead of spinning up a new loop per report.
     """
-    import asyncio
     print(f"🚀 Starting background AI generation for report {report_id}")
 
-    async def _generate():
-        try:
-            # Generate AI sections
-            print(f"📝 Calling Claude API for report {report_id}...")
-            enhanced_sections = await generate_enhanced_report(scraped_data, analysis)
-            print(f"📝 Claude API returned for report {report_id}")
-            print(f"📋 AI sections received: {list(enhanced_sections.keys())}")
-            logical_verdict_preview = (enhanced_sections.get("logical_verdict", "") or "")[:100]
-            print(f"📋 logical_verdict preview: '{logical_verdict_preview}...'")
-
-            # Update report in database
-            db = SessionLocal()
-            try:
-                report = db.query(Report).filter(Report.id == report_id).first()
-                if report and report.full_report:
-                    # Merge AI sections into existing report
-                    full_report = dict(report.full_report)  # Make mutable copy
-
-                    # Comprehensive AI sections (new format)
-                    full_report["short_description"] = enhanced_sections.get("short_description", "")
-                    full_report["lead_magnets_analysis"] = enhanced_sections.get("lead_magnets_analysis", "")
-                    full_report["forms_analysis"] = enhanced_sections.get("forms_analysis", "")
-                    full_report["cta_analysis"] = enhanced_sections.get("cta_analysis", "")
-                    full_report["logical_verdict"] = enhanced_sections.get("logical_verdict", "")
-                    full_report["summary_assessment"] = enhanced_sections.get("summary_assessment", "")
-                    full_report["criteria_explanations"] = enhanced_sections.get("criteria_explanations", {})
-
-                    # Apply AI-adjusted scores (quality-based, not just structural)
-                    adjusted_scores = enhanced_sections.get("adjusted_scores", {})
-                    if adjusted_scores and full_report.get("criteria_analysis"):
-                        criteria_analysis = list(full_report["criteria_analysis"])
-                        score_map = {
-                            "value_proposition": adjusted_scores.get("value_proposition"),
-                            "call_to_action": adjusted_scores.get("call_to_action"),
-                            "social_proof": adjusted_scores.get("social_proof"),
-                            "lead_magnets": adjusted_scores.get("lead_magnets"),
-                            "form_design": adjusted_scores.get("form_design"),
-                            "guiding_content": adjusted_scores.get("guiding_content"),
-                            "offer_structure": adjusted_scores.get("offer_structure"),
-                        }
-                        for i, criterion in enumerate(criteria_analysis):
-                            key = criterion.get("criterion")
-                            if key in score_map and score_map[key] is not None:
-                                try:
-                                    new_score = int(score_map[key])
-                                    new_score = max(1, min(5, new_score))  # Clamp 1-5
-                                    criteria_analysis[i] = dict(criterion)
-                                    criteria_analysis[i]["score"] = new_score
-                                except (ValueError, TypeError):
-                                    pass  # Keep original score if AI returned invalid
-                        full_report["criteria_analysis"] = criteria_analysis
-                        # Recalculate overall score using WEIGHTED formula
-                        # Viktning: value_proposition=2.0, call_to_action=1.5, lead_magnets=1.5, resten=1.0
-                        weights = {
-                            "value_proposition": 2.0,
-                            "call_to_action": 1.5,
-                            "lead_magnets": 1.5,
-                            "social_proof": 1.0,
-                            "form_design": 1.0,
-                            "guiding_content": 1.0,
-                            "offer_structure": 1.0,
-                        }
-                        total_weight = sum(weights.values())  # 9.0
-                        weighted_sum = sum(
-                            c["score"] * weights.get(c["criterion"], 1.0)
-                            for c in criteria_analysis
-                        )
-                        new_overall = round(weighted_sum / total_weight, 1)
-                        full_report["overall_score"] = new_overall
-                        report.overall_score = new_overall  # Update Report model too
-                        print(f"📊 Applied AI-adjusted scores for report {report_id}: overall {new_overall}/5 (weighted)")
-
-                    # Legacy fields (backward compatibility)
-                    full_report["final_hook"] = enhanced_sections.get("final_hook", "")
-                    full_report["detailed_lead_magnets"] = enhanced_sections.get("detailed_lead_magnets", "")
-                    full_report["detailed_forms"] = enhanced_sections.get("detailed_forms", "")
-                    full_report["detailed_social_proof"] = enhanced_sections.get("detailed_social_proof", "")
-                    full_report["detailed_mailto"] = enhanced_sections.get("detailed_mailto", "")
-                    full_report["detailed_ungated_pdfs"] = enhanced_sections.get("detailed_ungated_pdfs", "")
-
-                    full_report["ai_generated"] = True
-
-                    report.full_report = full_report
-                    db.commit()
-                    print(f"✅ AI generation complete for report {report_id}")
-            finally:
-                db.close()
-        except Exception as e:
-            print(f"❌ Background AI generation failed for report {report_id}: {e}")
+    try:
+        # Generate AI sections
+        print(f"📝 Calling Claude API for report {report_id}...")
+        enhanced_sections = await generate_enhanced_report(
+            scraped_data, analysis, industry, industry_confidence
+        )
+        print(f"📝 Claude API returned for report {report_id}")
+        print(f"📋 AI sections received: {list(enhanced_sections.keys())}")
+        logical_verdict_preview = (enhanced_sections.get("logical_verdict", "") or "")[:100]
+        print(f"📋 logical_verdict preview: '{logical_verdict_preview}...'")
+
+        # Update report in database
+        await run_in_threadpool(_save_ai_sections, report_id, enhanced_sections)
+    except Exception as e:
+        print(f"❌ Background AI generation failed for report {report_id}: {e}")
 
-    # Run in a new event loop (since BackgroundTasks runs in a thread)
-    asyncio.run(_generate())
 
 router = APIRouter()
 
@@ -226,7 +232,10 @@ async def analyze_url(
         db.commit()
 
         # Start AI generation in TRUE background (runs AFTER response is sent)
-        background_tasks.add_task(generate_ai_sync, report.id, scraped_data, analysis)
+        background_tasks.add_task(
+            generate_ai_background, report.id, scraped_data, analysis,
+            industry, industry_confidence
+        )
 
         # Generate teaser text
         teaser = f"Vi har identifierat {analysis['issues_found']} specifika fel som hindrar er från att dominera marknaden"
@@ -331,7 +340,7 @@ async def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/report/{report_id}")
+@router.get("/report/{report_id}", response_model=FullReportResponse)
 async def get_full_report(
     report_id: int,
     token: Optional[str] = Query(None),
@@ -340,7 +349,7 @@ async def get_full_report(
     """
     Get full report. Requires valid access token.
     """
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = db.query(Report).options(undefer(Report.full_report)).filter(Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Rapport hittades inte")
 
@@ -387,7 +396,7 @@ async def get_full_report(
             ))
 
     try:
-        return FullReportResponse(
+        full_report = FullReportResponse(
             report_id=report.id,
             url=report.url,
             company_name=report.company_name_detected,
@@ -433,6 +442,49 @@ async def get_full_report(
         logger.error(f"scraped keys: {list(scraped.keys())}")
         raise HTTPException(status_code=500, detail=f"Kunde inte bygga rapport: {str(e)}")
 
+    # Already validated above: serialize once instead of letting FastAPI
+    # re-validate against response_model (kept for the OpenAPI schema)
+    return Response(content=full_report.model_dump_json(), media_type="application/json")
+
+
+@router.get("/report/{report_id}/status", response_model=ReportStatus)
+async def get_report_status(
+    report_id: int,
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Lightweight AI generation status for polling. Requires valid access token.
+    Reads only the columns it needs instead of the full report JSON.
+    """
+    row = db.query(
+        Report.access_token,
+        Report.created_at,
+        Report.overall_score,
+        Report.full_report["ai_generated"].as_boolean(),
+    ).filter(Report.id == report_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Rapport hittades inte")
+
+    access_token, created_at, overall_score, ai_generated = row
+
+    # Verify access token
+    if not token or access_token != token:
+        raise HTTPException(
+            status_code=403,
+            detail="Åtkomst nekad. Vänligen fyll i formuläret för att få tillgång till rapporten."
+        )
+
+    # Check token expiry
+    expiry = created_at + timedelta(hours=settings.REPORT_ACCESS_TOKEN_EXPIRE_HOURS)
+    if datetime.utcnow() > expiry:
+        raise HTTPException(status_code=403, detail="Länken har upphört. Analysera sidan igen.")
+
+    return ReportStatus(
+        ai_generated=bool(ai_generated),
+        overall_score=float(overall_score) if overall_score is not None else None,
+    )
+
 
 @router.get("/report/{report_id}/pdf")
 async def download_report_pdf(
@@ -443,7 +495,7 @@ async def download_report_pdf(
     """
     Download report as PDF. Requires valid access token.
     """
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = db.query(Report).options(undefer(Report.full_report)).filter(Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Rapport hittades inte")
 
@@ -852,25 +904,40 @@ WIDGET_JS_TEMPLATE = '''
 '''
 
 
-@router.get("/widget.js")
-async def get_widget_js():
-    """
-    Return the embeddable widget JavaScript.
-    """
+def _build_widget_js() -> bytes:
+    """Render the widget JS once with the configured API URL."""
     # Replace API URL placeholder - use PUBLIC_URL if set, otherwise fallback to HOST:PORT
     if settings.PUBLIC_URL:
         api_url = f"{settings.PUBLIC_URL.rstrip('/')}/api"
     else:
         api_url = f"http://{settings.HOST}:{settings.PORT}/api"
-    js_content = WIDGET_JS_TEMPLATE.replace('%API_URL%', api_url)
+    return WIDGET_JS_TEMPLATE.replace('%API_URL%', api_url).encode("utf-8")
+
+
+# Pre-encoded at import: settings are fixed for the process lifetime
+WIDGET_JS_BYTES = _build_widget_js()
+WIDGET_JS_ETAG = '"' + hashlib.sha256(WIDGET_JS_BYTES).hexdigest()[:16] + '"'
+WIDGET_JS_HEADERS = {
+    # Embedded at a fixed URL: revalidate so widget changes reach customer sites
+    "Cache-Control": "public, max-age=300, must-revalidate",
+    "ETag": WIDGET_JS_ETAG,
+    "Access-Control-Allow-Origin": "*",
+}
+
+
+@router.get("/widget.js")
+async def get_widget_js(request: Request):
+    """
+    Return the embeddable widget JavaScript.
+    Answers 304 without a body when the client already has this version.
+    """
+    if request.headers.get("if-none-match") == WIDGET_JS_ETAG:
+        return Response(status_code=304, headers=WIDGET_JS_HEADERS)
 
     return Response(
-        content=js_content,
+        content=WIDGET_JS_BYTES,
         media_type="application/javascript",
-        headers={
-            "Cache-Control": "public, max-age=3600",
-            "Access-Control-Allow-Origin": "*",
-        }
+        headers=WIDGET_JS_HEADERS,
     )
 
 
@@ -1,8 +1,8 @@
 """
 Application configuration using Pydantic Settings.
 """
-from functools import lru_cache
-from typing import Optional
+from functools import cached_property, lru_cache
+from typing import FrozenSet, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -52,8 +52,22 @@ class Settings(BaseSettings):
     AI_ENABLED: bool = True
     AI_MODEL: str = "claude-3-5-haiku-20241022"  # Fast and cost-effective
     AI_MAX_TOKENS: int = 1500
+    AI_ALL_SECTIONS_MAX_TOKENS: int = 2048  # ~8 prose sections + 6 explanations in Swedish, with margin
     AI_TEMPERATURE: float = 0.7
     AI_FALLBACK_ON_ERROR: bool = True  # Use static templates if AI fails
+    AI_SKIP_LOW_SIGNAL: bool = True  # Use static templates for nearly empty scrapes
+    AI_CACHE_SIZE: int = 256  # Max cached Claude responses (0 disables)
+    AI_CACHE_TTL: int = 3600  # seconds
+
+    # Client-side throttling of Claude calls (0 disables a limit)
+    ANTHROPIC_MAX_CONCURRENCY: int = 5
+    ANTHROPIC_RPM: int = 50  # requests per minute
+    ANTHROPIC_TPM: int = 40_000  # input tokens per minute
+
+    @cached_property
+    def cors_origins_set(self) -> FrozenSet[str]:
+        """CORS origins parsed once into a frozenset for O(1) origin lookups."""
+        return frozenset(o.strip() for o in self.CORS_ORIGINS.split(",") if o.strip())
 
     class Config:
         env_file = ".env"
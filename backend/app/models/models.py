@@ -2,6 +2,7 @@
 SQLAlchemy database models for the Conversion Analyzer.
 """
 from datetime import datetime
+from types import MappingProxyType
 from sqlalchemy import (
     Column,
     Integer,
@@ -13,7 +14,7 @@ from sqlalchemy import (
     CheckConstraint,
     JSON,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database import Base
 
@@ -53,8 +54,8 @@ class Report(Base):
     company_name_detected = Column(String(255), nullable=True)
     company_description = Column(Text, nullable=True)
 
-    # Full report data stored as JSON
-    full_report = Column(JSON, nullable=True)
+    # Full report data stored as JSON (deferred: only loaded when accessed)
+    full_report = deferred(Column(JSON, nullable=True))
 
     # Scores
     overall_score = Column(Numeric(2, 1), nullable=True)
@@ -98,7 +99,8 @@ class AnalysisData(Base):
 
 
 # Analysis criteria constants - 7 kategorier enligt analyzer_prompt.md
-ANALYSIS_CRITERIA = [
+# (read-only: tuple and MappingProxyType so no caller can mutate them)
+ANALYSIS_CRITERIA = (
     "value_proposition",  # Tydlighet i värdeerbjudande (×2.0)
     "call_to_action",     # Call to Action (×1.5)
     "social_proof",       # Social Proof (×1.0)
@@ -106,9 +108,9 @@ ANALYSIS_CRITERIA = [
     "form_design",        # Formulärdesign (×1.0)
     "guiding_content",    # Vägledande innehåll (×1.0)
     "offer_structure",    # Erbjudandets struktur (×1.0) - NY
-]
+)
 
-CRITERIA_LABELS = {
+CRITERIA_LABELS = MappingProxyType({
     "value_proposition": "Värdeerbjudandets tydlighet",
     "call_to_action": "Call to Action-effektivitet",
     "social_proof": "Social proof & trovärdighet",
@@ -116,4 +118,4 @@ CRITERIA_LABELS = {
     "form_design": "Formulärdesign & friktion",
     "guiding_content": "Vägledande innehåll",
     "offer_structure": "Erbjudandets struktur",
-}
+})
@@ -3,26 +3,33 @@ Pydantic schemas for request/response validation.
 """
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, EmailStr, HttpUrl, Field, field_validator
+from urllib.parse import urlsplit
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+
+
+class _Base(BaseModel):
+    """Shared base: lets every schema validate straight from ORM objects."""
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============== Analysis Schemas ==============
 
-class AnalyzeRequest(BaseModel):
+class AnalyzeRequest(_Base):
     """Request schema for URL analysis."""
-    url: HttpUrl
+    url: str
 
     @field_validator("url")
     @classmethod
-    def validate_url(cls, v):
-        url_str = str(v)
-        # Ensure it's a web URL
-        if not url_str.startswith(("http://", "https://")):
+    def validate_url(cls, v: str) -> str:
+        # Ensure it's a web URL (plain str check, no full URL object parse)
+        if not v.startswith(("http://", "https://")):
             raise ValueError("URL must start with http:// or https://")
+        if not urlsplit(v).netloc:
+            raise ValueError("URL must include a host")
         return v
 
 
-class AnalysisCriterion(BaseModel):
+class AnalysisCriterion(_Base):
     """Single analysis criterion result."""
     criterion: str
     criterion_label: str
@@ -30,7 +37,7 @@ class AnalysisCriterion(BaseModel):
     explanation: str
 
 
-class ShortSummaryResponse(BaseModel):
+class ShortSummaryResponse(_Base):
     """Response schema for short (public) analysis summary."""
     report_id: int
     url: str
@@ -47,7 +54,7 @@ class ShortSummaryResponse(BaseModel):
     industry_label: Optional[str] = None     # Swedish industry label
 
 
-class FullReportResponse(BaseModel):
+class FullReportResponse(_Base):
     """Response schema for full analysis report."""
     report_id: int
     url: str
@@ -101,9 +108,15 @@ class FullReportResponse(BaseModel):
     created_at: datetime
 
 
+class ReportStatus(_Base):
+    """Minimal payload for polling AI generation progress."""
+    ai_generated: bool
+    overall_score: Optional[float]
+
+
 # ============== Lead Schemas ==============
 
-class LeadCreate(BaseModel):
+class LeadCreate(_Base):
     """Schema for creating a new lead."""
     name: str = Field(min_length=2, max_length=255)
     email: EmailStr
@@ -111,18 +124,15 @@ class LeadCreate(BaseModel):
     report_id: int
 
 
-class LeadResponse(BaseModel):
+class LeadResponse(_Base):
     """Response after lead creation."""
     success: bool
     message: str
     lead_id: Optional[int] = None
     access_token: Optional[str] = None
 
-    class Config:
-        from_attributes = True
-
 
-class LeadListItem(BaseModel):
+class LeadListItem(_Base):
     """Lead item for admin listing."""
     id: int
     name: str
@@ -131,13 +141,10 @@ class LeadListItem(BaseModel):
     analyzed_url: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # ============== Report Schemas ==============
 
-class ReportListItem(BaseModel):
+class ReportListItem(_Base):
     """Report item for admin listing."""
     id: int
     url: str
@@ -148,13 +155,10 @@ class ReportListItem(BaseModel):
     access_token: Optional[str] = None  # For PDF download link
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # ============== Widget Schemas ==============
 
-class WidgetConfig(BaseModel):
+class WidgetConfig(_Base):
     """Configuration options for embedded widget."""
     theme: str = "light"  # 'light' or 'dark'
     primary_color: str = "#2563eb"
@@ -164,7 +168,7 @@ class WidgetConfig(BaseModel):
 
 # ============== Admin Schemas ==============
 
-class DashboardStats(BaseModel):
+class DashboardStats(_Base):
     """Statistics for admin dashboard."""
     total_leads: int
     total_reports: int
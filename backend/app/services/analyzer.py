@@ -2,6 +2,8 @@
 Analysis service that scores and generates recommendations.
 Uses structured problem tagging according to the analyzer prompt methodology.
 """
+import re
+from collections import Counter
 from typing import Dict, List, Any, Tuple, Optional
 from app.models.models import CRITERIA_LABELS
 
@@ -28,6 +30,107 @@ CATEGORY_ICONS = {
     "offer_structure": "💰",
 }
 
+# Kontextuella beskrivningar när inga strukturella problem hittas
+# (bättre än generisk "Inga problem identifierade" som döljer nyanser)
+POSITIVE_EXPLANATIONS = {
+    "value_proposition": "Tydlig rubrik och underrubrik — värdeerbjudandet kommuniceras på strukturnivå.",
+    "call_to_action": "Multipla CTA:er med handlingsorienterat språk och god spridning.",
+    "social_proof": "God närvaro av kundreferenser, betyg eller sociala bevis.",
+    "lead_magnets": "Gated innehåll och lead magnets finns för att fånga besökare.",
+    "form_design": "Formulär med tydliga fält och konverteringsvänlig design.",
+    "guiding_content": "Tydlig väg framåt för besökaren genom sidan.",
+    "offer_structure": "Erbjudandet är segmenterat med tydlig prissättning.",
+}
+
+# Kriterier i rapportordning med etikett, ikon, vikt och positiv förklaring
+# uppslagna en gång vid import
+_RESOLVED_CRITERIA = tuple(
+    (
+        name,
+        CRITERIA_LABELS.get(name, name),
+        CATEGORY_ICONS.get(name, "📊"),
+        CATEGORY_WEIGHTS[name],
+        POSITIVE_EXPLANATIONS.get(name, "Inga strukturella problem identifierade."),
+    )
+    for name in (
+        "value_proposition",
+        "call_to_action",
+        "social_proof",
+        "lead_magnets",
+        "form_design",
+        "guiding_content",
+        "offer_structure",
+    )
+)
+
+# Fasta avslutande rader (6-8) i den obarmhärtiga analysen
+_SUMMARY_CLOSING = "\n\n".join((
+    "Varje dag er webbsida ser ut så här förlorar ni potentiella kunder till konkurrenter som förstår lead generation.",
+    "Kostnaden för dessa brister är inte synlig i er budget, men den är verklig i förlorade affärer.",
+    "Fixarna nedan är konkreta och mätbara - frågan är om ni prioriterar tillväxt eller status quo.",
+))
+
+# Flaggor för vilka brister som finns (se ConversionAnalyzer._flags)
+FLAG_HAS_MAILTO = 1
+FLAG_HAS_UNGATED = 2
+FLAG_NO_MAGNETS = 4
+FLAG_NO_SOCIAL = 8
+FLAG_NO_LEAD_FORMS = 16
+FLAG_NO_H1 = 32
+FLAG_NO_CTAS = 64
+
+# Saknade element räknas som ett problem vardera
+_MISSING_MASK = (FLAG_NO_MAGNETS | FLAG_NO_SOCIAL | FLAG_NO_LEAD_FORMS
+                 | FLAG_NO_H1 | FLAG_NO_CTAS)
+
+# Logiska fel för kort sammanfattning, i prioritetsordning
+_LOGICAL_ERRORS = (
+    (FLAG_HAS_MAILTO, "Ni har {mailto} mailto-länkar som läcker leads till era konkurrenter"),
+    (FLAG_HAS_UNGATED, "{ungated} värdefulla PDF-resurser ges bort utan att fånga e-postadresser"),
+    (FLAG_NO_MAGNETS, "Inga lead magnets identifierade - ni missar alla passiva leads"),
+    (FLAG_NO_SOCIAL, "Ingen synlig social proof - besökare har ingen anledning att lita på er"),
+    (FLAG_NO_LEAD_FORMS, "Inga lead capture-formulär - hur tänker ni konvertera trafik?"),
+    (FLAG_NO_H1, "Ingen H1-rubrik - besökare vet inte vad ni erbjuder inom 3 sekunder"),
+)
+
+# Generella rekommendationer som fyller ut listan till 5
+_GENERIC_RECOMMENDATIONS = (
+    "Implementera exit-intent popups för att fånga besökare som är på väg att lämna.",
+    "A/B-testa era formulär - även små ändringar i knapptext kan öka konverteringen 20-30%.",
+    "Installera heatmap-verktyg för att se var besökare faktiskt klickar och scrollar.",
+    "Skapa en dedikerad landningssida för varje trafikskälla ni använder.",
+    "Bygg en e-postsekvens som automatiskt nurturar leads som laddar ner ert material.",
+)
+
+
+def _keyword_re(*keywords: str) -> "re.Pattern[str]":
+    """Compile keywords into one substring alternation (matched against lowercase text)."""
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+# Svaga/generiska CTA-texter: exakt träff på hela texten, eller "läs mer"/"klicka" var som helst
+_WEAK_CTA_TEXTS = frozenset({"läs mer", "read more", "mer info", "more info", "klicka här",
+                             "click here", "skicka", "submit", "send", "vidare", "continue"})
+_WEAK_CTA_RE = _keyword_re("läs mer", "klicka")
+
+# Generiska texter på formulärens skicka-knapp
+_GENERIC_SUBMIT_TEXTS = frozenset({"submit", "skicka", "send", "ok", "continue", "vidare"})
+
+# Starkt, handlingsorienterat CTA-språk
+_STRONG_CTA_RE = _keyword_re("gratis", "free", "starta", "start", "prova", "try",
+                             "boka", "book", "få ", "get", "hämta", "ladda")
+
+# Vaga rubriker som inte förklarar erbjudandet
+_VAGUE_H1_RE = _keyword_re("välkommen", "welcome", "vi är", "we are", "hem", "home")
+
+# Svagt värdeerbjudande för lead magnets ("prenumerera på nyhetsbrev")
+_WEAK_VALUE_RE = _keyword_re("nyhetsbrev", "newsletter", "prenumerera", "subscribe")
+
+# Låg tröskel-erbjudanden i CTA-texter
+_LOW_BARRIER_RE = _keyword_re("gratis", "free", "kostnadsfri", "prova", "try",
+                              "demo", "test", "provperiod", "trial", "ingen bindning",
+                              "no commitment", "konsultation", "consultation")
+
 
 def get_status_from_score(score: int) -> str:
     """Determine status based on score."""
@@ -39,6 +142,10 @@ def get_status_from_score(score: int) -> str:
         return "good"
 
 
+# Status per integer score 0-5 (criterion scores are always 1-5)
+_STATUS_BY_SCORE = tuple(get_status_from_score(score) for score in range(6))
+
+
 class ConversionAnalyzer:
     """
     Analyzes scraped data and generates scores, issues, and recommendations.
@@ -46,9 +153,43 @@ class ConversionAnalyzer:
     Uses structured problem tagging with severity levels.
     """
 
+    __slots__ = (
+        "data", "_vp", "_ctas", "_cta_texts", "_social", "_magnets",
+        "_mailto", "_ungated", "_lead_forms", "_flags", "_gaps", "_analysis",
+    )
+
     def __init__(self, scraped_data: Dict[str, Any]):
         self.data = scraped_data
 
+        # Snapshot of the scraped fields every scorer reads, derived once
+        self._vp = scraped_data.get("value_proposition", {})
+        self._ctas = scraped_data.get("cta_buttons", [])
+        # Gemener av varje CTA-text, parallellt med self._ctas
+        self._cta_texts = tuple((c.get("text") or "").lower() for c in self._ctas)
+        self._social = scraped_data.get("social_proof", [])
+        self._magnets = scraped_data.get("lead_magnets", [])
+        self._mailto = scraped_data.get("mailto_links", [])
+        self._ungated = scraped_data.get("ungated_pdfs", [])
+        # Filtrera bort sökformulär
+        self._lead_forms = [f for f in scraped_data.get("forms", []) if f.get("type") != "search"]
+
+        # Presence/absence of each issue kind, evaluated once
+        self._flags = (
+            (FLAG_HAS_MAILTO if self._mailto else 0)
+            | (FLAG_HAS_UNGATED if self._ungated else 0)
+            | (FLAG_NO_MAGNETS if not self._magnets else 0)
+            | (FLAG_NO_SOCIAL if not self._social else 0)
+            | (FLAG_NO_LEAD_FORMS if not self._lead_forms else 0)
+            | (FLAG_NO_H1 if not self._vp.get("h1") else 0)
+            | (FLAG_NO_CTAS if not self._ctas else 0)
+        )
+
+        # Issue count and logical errors, shared by analysis and summary
+        self._gaps = self._find_gaps()
+
+        # Memoised result of generate_analysis
+        self._analysis: Optional[Dict[str, Any]] = None
+
     def analyze_value_proposition(self) -> Dict[str, Any]:
         """
         Score the clarity and effectiveness of the value proposition.
@@ -67,7 +208,7 @@ class ConversionAnalyzer:
         4 = Tydliga fördelar men vissa påståenden saknar bevis
         5 = Kristallklart värde, tydliga fördelar med bevis
         """
-        vp = self.data.get("value_proposition", {})
+        vp = self._vp
         problems = []
 
         h1 = vp.get("h1")
@@ -102,8 +243,8 @@ class ConversionAnalyzer:
             })
 
         # Kontrollera vaga rubriker
-        vague_phrases = ["välkommen", "welcome", "vi är", "we are", "hem", "home"]
-        if h1 and any(phrase in h1.lower() for phrase in vague_phrases):
+        is_vague_h1 = bool(h1) and _VAGUE_H1_RE.search(h1.lower()) is not None
+        if is_vague_h1:
             problems.append({
                 "tag": "unclear_headline",
                 "severity": "high",
@@ -145,7 +286,7 @@ class ConversionAnalyzer:
             })
 
         # Beräkna poäng baserat på promptens poängguide
-        if not h1 or (h1 and any(phrase in h1.lower() for phrase in vague_phrases)):
+        if not h1 or is_vague_h1:
             score = 1  # Rubriken förklarar inte vad företaget gör
         elif not has_hero and not has_subheadline:
             score = 2  # Värdeerbjudande finns men fokuserar på egenskaper
@@ -162,7 +303,7 @@ class ConversionAnalyzer:
             score = 5
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -186,7 +327,7 @@ class ConversionAnalyzer:
         4 = Bra CTA, synlig placering, kan förstärkas
         5 = Optimala CTA:er med starkt språk, multipla placeringar
         """
-        raw_ctas = self.data.get("cta_buttons", [])
+        raw_ctas = self._ctas
         problems = []
 
         # Filtrera bort GDPR/cookie-knappar och submit-knappar som inte är äkta CTA:er
@@ -195,16 +336,14 @@ class ConversionAnalyzer:
                       "aktivera alla", "spara ändringar", "inställningar",
                       "accept all", "reject all", "cookie settings"}
 
-        def is_gdpr_cta(cta: dict) -> bool:
+        ctas = []
+        cta_texts = []
+        for cta, text in zip(raw_ctas, self._cta_texts):
             classes = " ".join(cta.get("classes", []) or []).lower()
-            text = (cta.get("text") or "").lower().strip()
-            if any(marker in classes for marker in gdpr_markers):
-                return True
-            if text in gdpr_texts:
-                return True
-            return False
-
-        ctas = [c for c in raw_ctas if not is_gdpr_cta(c)]
+            if any(marker in classes for marker in gdpr_markers) or text.strip() in gdpr_texts:
+                continue
+            ctas.append(cta)
+            cta_texts.append(text)
 
         if not ctas:
             problems.append({
@@ -225,22 +364,21 @@ class ConversionAnalyzer:
                 "recommendation": "Upprepa er CTA på strategiska platser genom hela sidan – efter varje sektion som bygger värde.",
                 "evidence": f"Hittade 1 CTA: '{ctas[0].get('text', '')}'"
             })
-
-        # Kontrollera dubletter (samma text flera gånger indikerar brist på fokus)
-        cta_texts_lower = [(c.get("text") or "").lower().strip() for c in ctas]
-        duplicate_count = len(cta_texts_lower) - len(set(cta_texts_lower))
-        if duplicate_count > 0:
-            # Hitta vilka som är dublerade
-            from collections import Counter
-            counts = Counter(cta_texts_lower)
-            duplicates = [t for t, n in counts.items() if n > 1 and t]
-            problems.append({
-                "tag": "duplicate_ctas",
-                "severity": "medium",
-                "description": f"Flera identiska CTA:er hittades ({duplicate_count} dubletter). Detta tyder på brist på strategisk placering och spridd fokus.",
-                "recommendation": "Konsolidera identiska CTA:er och använd en tydlig primär-CTA per sektion. Varje CTA ska driva mot ett specifikt nästa steg.",
-                "evidence": f"Dubletter: {', '.join(duplicates[:3])}"
-            })
+        else:
+            # Kontrollera dubletter (samma text flera gånger indikerar brist på fokus)
+            cta_texts_lower = [t.strip() for t in cta_texts]
+            duplicate_count = len(cta_texts_lower) - len(set(cta_texts_lower))
+            if duplicate_count > 0:
+                # Hitta vilka som är dublerade
+                counts = Counter(cta_texts_lower)
+                duplicates = [t for t, n in counts.items() if n > 1 and t]
+                problems.append({
+                    "tag": "duplicate_ctas",
+                    "severity": "medium",
+                    "description": f"Flera identiska CTA:er hittades ({duplicate_count} dubletter). Detta tyder på brist på strategisk placering och spridd fokus.",
+                    "recommendation": "Konsolidera identiska CTA:er och använd en tydlig primär-CTA per sektion. Varje CTA ska driva mot ett specifikt nästa steg.",
+                    "evidence": f"Dubletter: {', '.join(duplicates[:3])}"
+                })
 
         # Kontrollera för många CTA:er (valparalys)
         if len(ctas) > 6:
@@ -252,13 +390,16 @@ class ConversionAnalyzer:
                 "evidence": f"{len(ctas)} unika CTA:er hittades"
             })
 
-        # Kontrollera svaga/generiska CTA-texter
-        weak_texts = ["läs mer", "read more", "mer info", "more info", "klicka här",
-                      "click here", "skicka", "submit", "send", "vidare", "continue"]
+        # Kontrollera svaga/generiska CTA-texter och starka CTA:er i samma pass
+        has_weak_cta = False
+        has_strong_cta = False
 
-        for cta in ctas:
-            cta_text = (cta.get("text") or "").lower().strip()
-            if cta_text in weak_texts or any(weak in cta_text for weak in ["läs mer", "klicka"]):
+        for cta, cta_text in zip(ctas, cta_texts):
+            if not has_strong_cta and _STRONG_CTA_RE.search(cta_text):
+                has_strong_cta = True
+            if not has_weak_cta and (cta_text.strip() in _WEAK_CTA_TEXTS
+                                     or _WEAK_CTA_RE.search(cta_text)):
+                has_weak_cta = True  # Rapportera bara första svaga CTA:n
                 problems.append({
                     "tag": "generic_cta_text",
                     "severity": "high",
@@ -266,19 +407,13 @@ class ConversionAnalyzer:
                     "recommendation": "Byt till handlingsorienterat språk som kommunicerar värde: 'Få din kostnadsfria analys', 'Boka ditt gratis samtal', 'Starta din provperiod'.",
                     "evidence": f"Hittade CTA: '{cta.get('text')}'"
                 })
-                break  # Rapportera bara första svaga CTA:n
-
-        # Kontrollera om det finns starka CTA:er
-        strong_patterns = ["gratis", "free", "starta", "start", "prova", "try",
-                          "boka", "book", "få ", "get", "hämta", "ladda"]
-        has_strong_cta = any(
-            any(p in (cta.get("text") or "").lower() for p in strong_patterns)
-            for cta in ctas
-        )
+            if has_weak_cta and has_strong_cta:
+                break
 
         # Beräkna poäng
-        high_problems = len([p for p in problems if p["severity"] == "high"])
-        medium_problems = len([p for p in problems if p["severity"] == "medium"])
+        severities = Counter(p["severity"] for p in problems)
+        high_problems = severities["high"]
+        medium_problems = severities["medium"]
 
         if not ctas:
             score = 1
@@ -294,7 +429,7 @@ class ConversionAnalyzer:
             score = 3  # Saknar starkt språk
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -317,7 +452,7 @@ class ConversionAnalyzer:
         4 = Flera typer av social proof, bra placering
         5 = Omfattande proof magnets – testimonials, siffror, logotyper
         """
-        proof = self.data.get("social_proof", [])
+        proof = self._social
         problems = []
 
         if not proof:
@@ -331,11 +466,15 @@ class ConversionAnalyzer:
             return {"score": 1, "problems": problems}
 
         # Analysera vilka typer som finns
-        types_found = set(p.get("type") for p in proof)
-
-        has_testimonials = "testimonial" in types_found or "quote" in types_found
-        has_logos = "client_logos" in types_found
-        has_ratings = "ratings" in types_found
+        has_testimonials = has_logos = has_ratings = False
+        for p in proof:
+            proof_type = p.get("type")
+            if proof_type == "testimonial" or proof_type == "quote":
+                has_testimonials = True
+            elif proof_type == "client_logos":
+                has_logos = True
+            elif proof_type == "ratings":
+                has_ratings = True
 
         if not has_testimonials:
             problems.append({
@@ -379,7 +518,7 @@ class ConversionAnalyzer:
             score = 5
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -402,9 +541,9 @@ class ConversionAnalyzer:
         4 = Bra leadmagnet med tydligt värde, men för många fält
         5 = Oemotståndlig leadmagnet, minimalt formulär, strategiskt placerad
         """
-        magnets = self.data.get("lead_magnets", [])
-        ungated = self.data.get("ungated_pdfs", [])
-        mailto = self.data.get("mailto_links", [])
+        magnets = self._magnets
+        ungated = self._ungated
+        mailto = self._mailto
         problems = []
 
         # Kritiskt: Inga leadmagneter
@@ -443,10 +582,8 @@ class ConversionAnalyzer:
         gated = [m for m in magnets if m.get("is_gated")]
 
         # Svagt värdeerbjudande ("prenumerera på nyhetsbrev")
-        weak_value_keywords = ["nyhetsbrev", "newsletter", "prenumerera", "subscribe"]
         for magnet in magnets:
-            text = magnet.get("text", "").lower()
-            if any(kw in text for kw in weak_value_keywords):
+            if _WEAK_VALUE_RE.search(magnet.get("text", "").lower()):
                 problems.append({
                     "tag": "weak_lead_magnet_value",
                     "severity": "medium",
@@ -474,7 +611,7 @@ class ConversionAnalyzer:
             score = 3
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -496,11 +633,8 @@ class ConversionAnalyzer:
         4 = Strömlinjeformat, få fält, bra knapptext
         5 = Friktionsfritt, minimala fält, handlingsorienterad knapp
         """
-        forms = self.data.get("forms", [])
         problems = []
-
-        # Filtrera bort sökformulär
-        lead_forms = [f for f in forms if f.get("type") != "search"]
+        lead_forms = self._lead_forms
 
         if not lead_forms:
             problems.append({
@@ -533,8 +667,7 @@ class ConversionAnalyzer:
                 break
 
             # Kontrollera generisk knapptext
-            generic_buttons = ["submit", "skicka", "send", "ok", "continue", "vidare"]
-            if submit_text in generic_buttons:
+            if submit_text in _GENERIC_SUBMIT_TEXTS:
                 has_generic_button = True
                 problems.append({
                     "tag": "generic_submit_button",
@@ -557,7 +690,7 @@ class ConversionAnalyzer:
             score = 4
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -581,9 +714,8 @@ class ConversionAnalyzer:
         """
         problems = []
 
-        forms = self.data.get("forms", [])
-        ctas = self.data.get("cta_buttons", [])
-        lead_forms = [f for f in forms if f.get("type") != "search"]
+        ctas = self._ctas
+        lead_forms = self._lead_forms
 
         # Kontrollera om det finns någon väg till konvertering
         if not lead_forms and not ctas:
@@ -596,7 +728,7 @@ class ConversionAnalyzer:
             })
 
         # mailto-länkar som indikerar dold kontaktinfo
-        mailto = self.data.get("mailto_links", [])
+        mailto = self._mailto
         if mailto and not lead_forms:
             problems.append({
                 "tag": "contact_info_hidden",
@@ -632,12 +764,12 @@ class ConversionAnalyzer:
             score = 3
 
         # Om inga allvarliga problem, ge högre poäng
-        high_severity_problems = [p for p in problems if p["severity"] == "high"]
-        if not high_severity_problems and has_forms and has_ctas:
+        has_high_severity = any(p["severity"] == "high" for p in problems)
+        if not has_high_severity and has_forms and has_ctas:
             score = min(5, score + 1)
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
@@ -660,7 +792,7 @@ class ConversionAnalyzer:
         5 = "No-brainer" erbjudande, transparent prissättning, bonusar
         """
         problems = []
-        ctas = self.data.get("cta_buttons", [])
+        ctas = self._ctas
         offer_data = self.data.get("offer_structure", {})
 
         # Kontrollera efter låg tröskel-erbjudanden från scraper
@@ -668,13 +800,7 @@ class ConversionAnalyzer:
 
         # Backup: kontrollera CTAs om scraper inte hittade något
         if not has_free_offer:
-            low_barrier_keywords = ["gratis", "free", "kostnadsfri", "prova", "try",
-                                   "demo", "test", "provperiod", "trial", "ingen bindning",
-                                   "no commitment", "konsultation", "consultation"]
-            has_free_offer = any(
-                any(kw in cta.get("text", "").lower() for kw in low_barrier_keywords)
-                for cta in ctas
-            )
+            has_free_offer = any(_LOW_BARRIER_RE.search(text) for text in self._cta_texts)
 
         if not has_free_offer:
             problems.append({
@@ -724,15 +850,25 @@ class ConversionAnalyzer:
             score = 5  # No-brainer med segmentering
 
         # Justera nedåt om det finns allvarliga problem
-        high_severity_problems = [p for p in problems if p["severity"] == "high"]
-        if high_severity_problems:
+        if any(p["severity"] == "high" for p in problems):
             score = min(score, 2)
 
         return {
-            "score": max(1, min(5, score)),
+            "score": score,
             "problems": problems,
         }
 
+    # Scorer functions in the same order as _RESOLVED_CRITERIA
+    _ANALYZERS = (
+        analyze_value_proposition,
+        analyze_cta,
+        analyze_social_proof,
+        analyze_lead_magnets,
+        analyze_form_design,
+        analyze_guiding_content,
+        analyze_offer_structure,
+    )
+
     def generate_leaking_funnels(self) -> List[Dict[str, Any]]:
         """
         Generate a dedicated leaking funnels section.
@@ -741,8 +877,7 @@ class ConversionAnalyzer:
         leaking_funnels = []
 
         # mailto-länkar
-        mailto = self.data.get("mailto_links", [])
-        for m in mailto:
+        for m in self._mailto:
             leaking_funnels.append({
                 "type": "mailto_link_leak",
                 "severity": "high",
@@ -752,8 +887,7 @@ class ConversionAnalyzer:
             })
 
         # Ungated PDFs
-        ungated = self.data.get("ungated_pdfs", [])
-        for pdf in ungated:
+        for pdf in self._ungated:
             leaking_funnels.append({
                 "type": "open_pdf_leak",
                 "severity": "high",
@@ -767,193 +901,118 @@ class ConversionAnalyzer:
     def generate_analysis(self) -> Dict[str, Any]:
         """
         Generate complete analysis with all scores, problems, and explanations.
+        Computed on first call; later calls return the same result.
         """
+        if self._analysis is not None:
+            return self._analysis
+
         criteria_analysis = []
+        weighted_sum = 0
 
         # Analyze each criterion
-        analysis_methods = [
-            ("value_proposition", self.analyze_value_proposition),
-            ("call_to_action", self.analyze_cta),
-            ("social_proof", self.analyze_social_proof),
-            ("lead_magnets", self.analyze_lead_magnets),
-            ("form_design", self.analyze_form_design),
-            ("guiding_content", self.analyze_guiding_content),
-            ("offer_structure", self.analyze_offer_structure),
-        ]
-
-        # Kontextuella beskrivningar när inga strukturella problem hittas
-        # (bättre än generisk "Inga problem identifierade" som döljer nyanser)
-        positive_explanations = {
-            "value_proposition": "Tydlig rubrik och underrubrik — värdeerbjudandet kommuniceras på strukturnivå.",
-            "call_to_action": "Multipla CTA:er med handlingsorienterat språk och god spridning.",
-            "social_proof": "God närvaro av kundreferenser, betyg eller sociala bevis.",
-            "lead_magnets": "Gated innehåll och lead magnets finns för att fånga besökare.",
-            "form_design": "Formulär med tydliga fält och konverteringsvänlig design.",
-            "guiding_content": "Tydlig väg framåt för besökaren genom sidan.",
-            "offer_structure": "Erbjudandet är segmenterat med tydlig prissättning.",
-        }
-
-        for criterion, method in analysis_methods:
-            result = method()
+        for (criterion, label, icon, weight, positive_explanation), analyze in zip(
+            _RESOLVED_CRITERIA, self._ANALYZERS
+        ):
+            result = analyze(self)
             score = result["score"]
-            weight = CATEGORY_WEIGHTS[criterion]
+            weighted_score = round(score * weight, 2)
+            weighted_sum += weighted_score
 
             if result["problems"]:
                 explanation = " | ".join([p["description"] for p in result["problems"]])
             else:
                 # Kontextuell positiv förklaring baserad på kriterium
-                explanation = positive_explanations.get(
-                    criterion,
-                    "Inga strukturella problem identifierade."
-                )
+                explanation = positive_explanation
 
             criteria_analysis.append({
                 "criterion": criterion,
-                "criterion_label": CRITERIA_LABELS.get(criterion, criterion),
-                "icon": CATEGORY_ICONS.get(criterion, "📊"),
+                "criterion_label": label,
+                "icon": icon,
                 "score": score,
                 "weight": weight,
-                "weighted_score": round(score * weight, 2),
-                "status": get_status_from_score(score),
+                "weighted_score": weighted_score,
+                "status": _STATUS_BY_SCORE[score],
                 "problems": result["problems"],
                 # Legacy: Keep explanation for backwards compatibility
                 "explanation": explanation,
             })
 
-        # Calculate weighted overall score
-        weighted_sum = sum(c["weighted_score"] for c in criteria_analysis)
-        # Normalisera till 1-5 skala
+        # Normalisera viktad summa till 1-5 skala
         overall_score = round((weighted_sum / TOTAL_WEIGHT), 1)
 
-        # Count issues
-        issues_found = self._count_issues()
-
-        # Generate logical errors (for short summary)
-        logical_errors = self._generate_logical_errors()
+        # Count issues and generate logical errors (for short summary)
+        issues_found, logical_errors = self._gaps
 
         # Generate leaking funnels
         leaking_funnels = self.generate_leaking_funnels()
 
-        return {
+        self._analysis = {
             "criteria_analysis": criteria_analysis,
             "overall_score": overall_score,
             "issues_found": issues_found,
             "logical_errors": logical_errors,
             "leaking_funnels": leaking_funnels,
         }
+        return self._analysis
 
-    def _count_issues(self) -> int:
-        """Count total number of issues found."""
-        count = 0
-        count += len(self.data.get("mailto_links", []))
-        count += len(self.data.get("ungated_pdfs", []))
-
-        forms = self.data.get("forms", [])
-        lead_forms = [f for f in forms if f.get("type") != "search"]
-        if not lead_forms:
-            count += 1
-
-        if not self.data.get("lead_magnets"):
-            count += 1
-
-        if not self.data.get("social_proof"):
-            count += 1
-
-        if not self.data.get("cta_buttons"):
-            count += 1
-
-        vp = self.data.get("value_proposition", {})
-        if not vp.get("h1"):
-            count += 1
-
-        return count
-
-    def _generate_logical_errors(self) -> List[str]:
-        """Generate list of logical errors for short summary."""
-        errors = []
-
-        mailto = self.data.get("mailto_links", [])
-        if mailto:
-            errors.append(f"Ni har {len(mailto)} mailto-länkar som läcker leads till era konkurrenter")
-
-        ungated = self.data.get("ungated_pdfs", [])
-        if ungated:
-            errors.append(f"{len(ungated)} värdefulla PDF-resurser ges bort utan att fånga e-postadresser")
-
-        if not self.data.get("lead_magnets"):
-            errors.append("Inga lead magnets identifierade - ni missar alla passiva leads")
-
-        if not self.data.get("social_proof"):
-            errors.append("Ingen synlig social proof - besökare har ingen anledning att lita på er")
-
-        forms = self.data.get("forms", [])
-        lead_forms = [f for f in forms if f.get("type") != "search"]
-        if not lead_forms:
-            errors.append("Inga lead capture-formulär - hur tänker ni konvertera trafik?")
-
-        vp = self.data.get("value_proposition", {})
-        if not vp.get("h1"):
-            errors.append("Ingen H1-rubrik - besökare vet inte vad ni erbjuder inom 3 sekunder")
+    def _find_gaps(self) -> Tuple[int, List[str]]:
+        """
+        Issue count and logical errors (for short summary) in one pass over
+        the scraped data. Shared by generate_analysis and
+        generate_summary_assessment.
+        """
+        n_mailto = len(self._mailto)
+        n_ungated = len(self._ungated)
+        flags = self._flags
+
+        count = n_mailto + n_ungated + (flags & _MISSING_MASK).bit_count()
+        errors = [
+            template.format(mailto=n_mailto, ungated=n_ungated)
+            for flag, template in _LOGICAL_ERRORS
+            if flags & flag
+        ]
 
-        return errors[:5]  # Max 5 errors for summary
+        return count, errors[:5]  # Max 5 errors for summary
 
     def generate_summary_assessment(self) -> str:
         """
         Generate 8 lines of 'obarmhärtig analys' (ruthless analysis).
         """
-        lines = []
         company = self.data.get("company_info", {}).get("company_name", "Ert företag")
 
-        mailto = self.data.get("mailto_links", [])
-        ungated = self.data.get("ungated_pdfs", [])
-        forms = self.data.get("forms", [])
-        lead_forms = [f for f in forms if f.get("type") != "search"]
-        social = self.data.get("social_proof", [])
-        magnets = self.data.get("lead_magnets", [])
-
-        # Line 1: Overall assessment
-        issues = self._count_issues()
-        if issues > 5:
-            lines.append(f"{company} har allvarliga brister i sin lead generation-strategi.")
-        elif issues > 2:
-            lines.append(f"{company} har flera tydliga förbättringsområden i sin konverteringstratt.")
-        else:
-            lines.append(f"{company} har en grundläggande struktur på plats men missar viktiga möjligheter.")
+        mailto = self._mailto
+        ungated = self._ungated
+        lead_forms = self._lead_forms
+        issues, _ = self._gaps
 
-        # Line 2: mailto links
-        if mailto:
-            lines.append(f"Att exponera {len(mailto)} e-postadresser via mailto-länkar är amatörmässigt - ni ger bort leads gratis.")
-        else:
-            lines.append("Bra att ni undviker direkta mailto-länkar, men det räcker inte.")
+        lines = (
+            # Line 1: Overall assessment
+            f"{company} har allvarliga brister i sin lead generation-strategi." if issues > 5
+            else f"{company} har flera tydliga förbättringsområden i sin konverteringstratt." if issues > 2
+            else f"{company} har en grundläggande struktur på plats men missar viktiga möjligheter.",
 
-        # Line 3: Lead magnets
-        if not magnets:
-            lines.append("Utan lead magnets förlitar ni er helt på att besökare aktivt kontaktar er - det gör de inte.")
-        elif ungated:
-            lines.append(f"Att ge bort {len(ungated)} PDF-resurser utan att fånga e-post är att kasta pengar i sjön.")
+            # Line 2: mailto links
+            f"Att exponera {len(mailto)} e-postadresser via mailto-länkar är amatörmässigt - ni ger bort leads gratis." if mailto
+            else "Bra att ni undviker direkta mailto-länkar, men det räcker inte.",
 
-        # Line 4: Forms
-        if not lead_forms:
-            lines.append("Avsaknaden av konverteringsformulär betyder att er webbplats är en digital broschyr, inte ett säljverktyg.")
-        else:
-            lines.append(f"Med {len(lead_forms)} formulär har ni åtminstone grunderna på plats.")
-
-        # Line 5: Social proof
-        if not social:
-            lines.append("Ingen social proof syns - varje besökare måste lita blint på er, och det gör de inte.")
-        else:
-            lines.append("Social proof finns men kan troligen stärkas med fler kundcase och resultat.")
+            # Line 3: Lead magnets (utelämnas om magnets finns och inga PDF:er är öppna)
+            "Utan lead magnets förlitar ni er helt på att besökare aktivt kontaktar er - det gör de inte." if not self._magnets
+            else f"Att ge bort {len(ungated)} PDF-resurser utan att fånga e-post är att kasta pengar i sjön." if ungated
+            else None,
 
-        # Line 6: The reality
-        lines.append("Varje dag er webbsida ser ut så här förlorar ni potentiella kunder till konkurrenter som förstår lead generation.")
+            # Line 4: Forms
+            "Avsaknaden av konverteringsformulär betyder att er webbplats är en digital broschyr, inte ett säljverktyg." if not lead_forms
+            else f"Med {len(lead_forms)} formulär har ni åtminstone grunderna på plats.",
 
-        # Line 7: The cost
-        lines.append("Kostnaden för dessa brister är inte synlig i er budget, men den är verklig i förlorade affärer.")
+            # Line 5: Social proof
+            "Ingen social proof syns - varje besökare måste lita blint på er, och det gör de inte." if not self._social
+            else "Social proof finns men kan troligen stärkas med fler kundcase och resultat.",
 
-        # Line 8: The path forward
-        lines.append("Fixarna nedan är konkreta och mätbara - frågan är om ni prioriterar tillväxt eller status quo.")
+            # Lines 6-8: The reality, the cost, the path forward
+            _SUMMARY_CLOSING,
+        )
 
-        return "\n\n".join(lines)
+        return "\n\n".join(line for line in lines if line is not None)
 
     def generate_recommendations(self) -> List[str]:
         """
@@ -961,14 +1020,13 @@ class ConversionAnalyzer:
         """
         recommendations = []
 
-        mailto = self.data.get("mailto_links", [])
-        ungated = self.data.get("ungated_pdfs", [])
-        forms = self.data.get("forms", [])
-        lead_forms = [f for f in forms if f.get("type") != "search"]
-        magnets = self.data.get("lead_magnets", [])
-        social = self.data.get("social_proof", [])
-        ctas = self.data.get("cta_buttons", [])
-        vp = self.data.get("value_proposition", {})
+        mailto = self._mailto
+        ungated = self._ungated
+        lead_forms = self._lead_forms
+        magnets = self._magnets
+        social = self._social
+        ctas = self._ctas
+        vp = self._vp
 
         # Priority 1: Fix leaks
         if mailto:
@@ -1016,15 +1074,6 @@ class ConversionAnalyzer:
             )
 
         # Generic strong recommendations if we haven't filled 5
-        generic = [
-            "Implementera exit-intent popups för att fånga besökare som är på väg att lämna.",
-            "A/B-testa era formulär - även små ändringar i knapptext kan öka konverteringen 20-30%.",
-            "Installera heatmap-verktyg för att se var besökare faktiskt klickar och scrollar.",
-            "Skapa en dedikerad landningssida för varje trafikskälla ni använder.",
-            "Bygg en e-postsekvens som automatiskt nurturar leads som laddar ner ert material.",
-        ]
-
-        while len(recommendations) < 5 and generic:
-            recommendations.append(generic.pop(0))
+        recommendations.extend(_GENERIC_RECOMMENDATIONS[:max(0, 5 - len(recommendations))])
 
         return recommendations[:5]
@@ -3,8 +3,9 @@ Industry detection service for identifying business sector from web content.
 Used to adapt report tone and terminology.
 """
 import re
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from collections import Counter
+from functools import lru_cache
 
 
 # Industry taxonomy with keywords, tone, and terminology
@@ -149,6 +150,67 @@ INDUSTRY_TAXONOMY: Dict[str, Dict[str, Any]] = {
 }
 
 
+def _build_keyword_weights() -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Map each lowercased keyword to its (industry, weight) entries. A keyword
+    listed under several industries (or twice under one) scores for each.
+    """
+    keyword_weights: Dict[str, List[Tuple[str, float]]] = {}
+    for industry, data in INDUSTRY_TAXONOMY.items():
+        for keyword in data["keywords"]:
+            # Weight longer keywords higher (more specific)
+            weight = 1 + (len(keyword.split()) - 1) * 0.5
+            keyword_weights.setdefault(keyword.lower(), []).append((industry, weight))
+    return keyword_weights
+
+
+def _check_keyword_prefixes(keywords) -> None:
+    """
+    Raise if a keyword is a whole-word prefix of another (e.g. "due" next to
+    "due diligence"). _KEYWORD_RE finds one keyword per position, so the
+    shorter one would silently stop scoring where the longer one matches.
+    """
+    for short in keywords:
+        bounded = re.compile(r"\b" + re.escape(short) + r"\b")
+        for long in keywords:
+            if long != short and long.startswith(short) and bounded.match(long):
+                raise ValueError(
+                    f"Industry keyword {short!r} is a whole-word prefix of {long!r}"
+                )
+
+
+_KEYWORD_WEIGHTS = _build_keyword_weights()
+_check_keyword_prefixes(_KEYWORD_WEIGHTS)
+
+# All keywords in one word-bounded alternation. The lookahead consumes no
+# text, so every position is tried and overlapping keywords (e.g. "equity"
+# inside "private equity") are each counted, like a separate scan per keyword.
+# Only one keyword can match per position; _check_keyword_prefixes() above
+# guarantees no other keyword could have matched there.
+_KEYWORD_RE = re.compile(
+    r"(?=\b("
+    + "|".join(re.escape(kw) for kw in sorted(_KEYWORD_WEIGHTS, key=len, reverse=True))
+    + r")\b)"
+)
+
+
+@lru_cache(maxsize=256)
+def _score_text(text: str) -> Tuple[Tuple[str, float], ...]:
+    """
+    Keyword scores for the combined page text. Cached on the text itself,
+    so re-analyses of an unchanged site skip the scan.
+    """
+    scores = Counter()
+
+    # Single pass over the text for all industries
+    for match in _KEYWORD_RE.finditer(text):
+        for industry, weight in _KEYWORD_WEIGHTS[match.group(1)]:
+            scores[industry] += weight
+
+    # Taxonomy order, so ties in detect() resolve as before
+    return tuple((industry, scores[industry]) for industry in INDUSTRY_TAXONOMY if industry in scores)
+
+
 class IndustryDetector:
     """
     Detects industry/sector from scraped web content.
@@ -163,6 +225,7 @@ class IndustryDetector:
             scraped_data: Dictionary containing company_info, value_proposition, etc.
         """
         self.data = scraped_data
+        self._detected: Optional[Tuple[str, float, str]] = None
 
     def detect(self) -> Tuple[str, float, str]:
         """
@@ -173,7 +236,12 @@ class IndustryDetector:
             - industry_key: Key from INDUSTRY_TAXONOMY (e.g., "finance")
             - confidence: Float 0.0-1.0 indicating detection confidence
             - label: Human-readable Swedish label (e.g., "Finans & Transaktionsrådgivning")
+
+        The result is memoised on the instance.
         """
+        if self._detected is not None:
+            return self._detected
+
         # Collect all text for analysis
         text_sources = self._collect_text()
         combined_text = " ".join(text_sources).lower()
@@ -182,17 +250,22 @@ class IndustryDetector:
         scores = self._score_industries(combined_text)
 
         if not scores:
-            return "general", 0.0, "Allmänt B2B"
-
-        # Get the top scoring industry
-        top_industry = max(scores, key=scores.get)
-        top_score = scores[top_industry]
+            self._detected = ("general", 0.0, "Allmänt B2B")
+            return self._detected
+
+        # Get the top scoring industry and the runner-up score in one pass
+        # (ties keep the first industry, and count as the runner-up)
+        top_industry = None
+        top_score = second_score = 0
+        for industry, score in scores.items():
+            if score > top_score:
+                top_industry, top_score, second_score = industry, score, top_score
+            elif score > second_score:
+                second_score = score
 
         # Calculate confidence based on:
         # 1. Absolute score (more matches = higher confidence)
         # 2. Relative score (how much it beats second place)
-        sorted_scores = sorted(scores.values(), reverse=True)
-        second_score = sorted_scores[1] if len(sorted_scores) > 1 else 0
 
         # Confidence formula
         absolute_confidence = min(top_score / 10, 1.0)  # Cap at 10 matches for max
@@ -203,7 +276,8 @@ class IndustryDetector:
 
         label = INDUSTRY_TAXONOMY[top_industry]["label"]
 
-        return top_industry, confidence, label
+        self._detected = (top_industry, confidence, label)
+        return self._detected
 
     def _collect_text(self) -> List[str]:
         """
@@ -248,19 +322,7 @@ class IndustryDetector:
         """
         Score each industry based on keyword matches.
         """
-        scores = Counter()
-
-        for industry, data in INDUSTRY_TAXONOMY.items():
-            for keyword in data["keywords"]:
-                # Use word boundary matching for more accuracy
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                matches = len(re.findall(pattern, text))
-                if matches > 0:
-                    # Weight longer keywords higher (more specific)
-                    weight = 1 + (len(keyword.split()) - 1) * 0.5
-                    scores[industry] += matches * weight
-
-        return dict(scores)
+        return dict(_score_text(text))
 
     def get_industry_tone(self, industry: str) -> str:
         """
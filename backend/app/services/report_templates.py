@@ -2,7 +2,7 @@
 Static report templates for fallback when AI is unavailable.
 Also provides structure and prompts for AI generation.
 """
-from typing import Dict, List, Any
+from typing import Dict, Sequence
 
 
 class ReportTemplates:
@@ -13,190 +13,67 @@ class ReportTemplates:
 
     # ==================== PROMPTS FOR AI ====================
 
-    @staticmethod
-    def get_short_description_prompt(
-        company_name: str,
-        company_description: str,
-        industry: str,
-        industry_tone: str,
-        main_issues: List[str]
-    ) -> str:
-        """
-        Build prompt for AI to generate short description (3 sentences).
-        """
-        issues_text = "\n".join(f"- {issue}" for issue in main_issues[:5])
-
-        return f"""Du är en obarmhärtig konverteringsexpert som analyserar webbsidor.
-Skriv EXAKT 3 meningar på svenska om företaget {company_name}.
-
-Bransch: {industry}
-Företagsbeskrivning: {company_description or 'Ingen beskrivning tillgänglig'}
-Huvudproblem vi identifierat:
-{issues_text}
-
-MENING 1: Beskriv vad företaget gör idag (kritiskt perspektiv - vad de ÄR)
-MENING 2: Beskriv vad de BORDE göra istället (vad de saknar)
-MENING 3: Konsekvensen av detta gap (affärspåverkan)
-
-TON: {industry_tone}
-
-EXEMPEL PÅ STIL:
-"Skarpa är en transaktionsrådgivare som agerar som en passiv informationsbroschyr snarare än en hungrig affärsgenerator. Webbplatsen presenterar vad företaget gör men misslyckas kapitalt med att aktivt bearbeta besökaren eller skapa ett psykologiskt behov av omedelbar kontakt. Det är en klassisk 'vi finns här'-sida utan säljtryck."
-
-VIKTIGT:
-- Använd "ni/er" istället för "de/dem" när du hänvisar till företaget
-- Var direkt och provocerande men professionell
-- Fokusera på AFFÄRSKONSEKVENSER
-- Max 3 meningar, inga fler"""
-
-    @staticmethod
-    def get_summary_assessment_prompt(
-        company_name: str,
-        industry: str,
-        industry_tone: str,
-        overall_score: float,
-        issues: List[str],
-        mailto_count: int,
-        ungated_pdf_count: int,
-        has_lead_magnets: bool,
-        has_forms: bool,
-        has_social_proof: bool
-    ) -> str:
-        """
-        Build prompt for AI to generate summary assessment (8 paragraphs).
-        """
-        issues_text = "\n".join(f"- {issue}" for issue in issues)
-
-        return f"""Du är en senior konverteringsexpert. Skriv EXAKT 8 stycken "obarmhärtig analys" på svenska för {company_name}.
-
-ANALYSDATA:
-- Bransch: {industry}
-- Övergripande betyg: {overall_score}/5
-- Antal mailto-länkar: {mailto_count}
-- Antal öppna PDF:er: {ungated_pdf_count}
-- Har lead magnets: {"Ja" if has_lead_magnets else "Nej"}
-- Har konverteringsformulär: {"Ja" if has_forms else "Nej"}
-- Har social proof: {"Ja" if has_social_proof else "Nej"}
-
-Identifierade problem:
-{issues_text}
-
-VARJE STYCKE SKA:
-1. Vara 2-3 meningar
-2. Vara provocerande men professionellt
-3. Fokusera på AFFÄRSKONSEKVENSER
-4. Använda "ni/er" (inte "de/dem")
-
-DE 8 STYCKENA (skriv i denna ordning):
-1. ÖVERGRIPANDE OMDÖME - Hur allvarligt är läget?
-2. STÖRSTA LÄCKAN - Det mest kritiska problemet
-3. KOSTNAD FÖR FELEN - Vad detta kostar i förlorade affärer
-4. KONKURRENSSITUATION - Hur ni står mot konkurrenter
-5. BESÖKARPSYKOLOGI - Varför besökare inte konverterar
-6. FÖRTROENDEUNDERSKOTT - Vad som saknas för att bygga tillit
-7. BRÅDSKANDE HANDLINGSBEHOV - Varför ni måste agera nu
-8. VÄG FRAMÅT - Kort om vad som krävs
-
-TON: {industry_tone}
-
-VIKTIGT: Skriv varje stycke på en ny rad. Inga numreringar eller rubriker."""
-
-    @staticmethod
-    def get_detailed_analysis_prompt(
-        category: str,
-        items: List[Dict],
-        issues: List[str],
-        industry: str,
-        industry_tone: str
-    ) -> str:
-        """
-        Build prompt for detailed analysis of a specific category.
-        """
-        items_text = "\n".join(
-            f"- {item.get('text', item.get('type', 'Okänd'))}"
-            for item in items[:10]
-        )
-
-        issues_text = "\n".join(f"- {issue}" for issue in issues)
-
-        category_labels = {
-            "lead_magnets": "Lead Magnets",
-            "forms": "Formulär",
-            "cta_buttons": "CTA-knappar",
-            "social_proof": "Social Proof",
-            "mailto_links": "Mailto-länkar (Läckande tratt)",
-            "ungated_pdfs": "Öppna PDF:er (Läckande tratt)"
-        }
-
-        return f"""Analysera kategorin "{category_labels.get(category, category)}" för en webbsida.
-
-Hittade element:
-{items_text if items else "Inga element hittade"}
-
-Problem i denna kategori:
-{issues_text if issues else "Inga specifika problem"}
-
-Skriv 2-4 meningar som:
-1. Sammanfattar vad som finns (eller saknas)
-2. Förklarar varför detta är ett problem
-3. Kvantifierar påverkan om möjligt
-
-TON: {industry_tone}
-SPRÅK: Svenska
-PERSPEKTIV: Använd "ni/er\""""
-
-    @staticmethod
-    def get_logical_verdict_prompt(
-        company_name: str,
-        main_issues: List[str],
-        mailto_count: int,
-        ungated_pdf_count: int,
-        missing_elements: List[str]
-    ) -> str:
-        """
-        Build prompt for logical verdict section.
-        """
-        issues_text = "\n".join(f"- {issue}" for issue in main_issues)
-        missing_text = "\n".join(f"- {elem}" for elem in missing_elements)
-
-        return f"""Skriv en "LOGISK DOM" för {company_name} på svenska.
-
-FAKTA:
-- {mailto_count} mailto-länkar (varje = läckande tratt)
-- {ungated_pdf_count} öppna PDF:er utan gate
-- Saknas: {missing_text}
-
-Problem:
-{issues_text}
-
-Skriv 3-4 meningar som:
-1. Sammanfattar "leaky funnel"-syndromet
-2. Förklarar affärskonsekvensen logiskt
-3. Använder termen "logisk kortslutning" om lämpligt
-
-TON: Direkt, logisk, obarmhärtig
-SPRÅK: Svenska
-PERSPEKTIV: Använd "ni/er\""""
-
-    @staticmethod
-    def get_final_hook_prompt(company_name: str, issues_count: int) -> str:
-        """
-        Build prompt for final hook/teaser.
-        """
-        return f"""Skriv en "teaser" för fullständig rapport för {company_name}.
-
-Vi har identifierat {issues_count} specifika problem.
-
-Skriv 2 meningar som:
-1. Nämner att detta bara är en ytlig analys
-2. Nämner antal problem som hindrar marknadsdominans
-3. Uppmanar till att beställa fullständig rapport
-
-EXEMPEL:
-"Detta är inte en djupgående analys, men vi har trots det identifierat {issues_count} specifika logiska fel som hindrar er från att dominera er marknad. För att få den kompletta åtgärdsplanen och tekniska specifikationer, beställ den fullständiga rapporten."
-
-SPRÅK: Svenska
-TON: Säljande men inte desperat"""
+    # Static instructions for generate_all_sections(), sent as the system
+    # prompt. Too short for Anthropic prompt caching (min 1024 tokens), so no
+    # cache breakpoint is set; keep it free of placeholders in case it grows.
+    ALL_SECTIONS_SYSTEM = """Du analyserar webbplatser för lead generation. Svenska, direkt ton.
+Du får DATA om en webbplats och strukturella BETYG (1-5) som du ska justera baserat på kvalitet.
+Svara genom att anropa verktyget emit_report."""
+
+    # Forced tool for generate_all_sections(); the schema replaces the old
+    # "Svara ENDAST JSON" skeleton so the reply is always a bare JSON object
+    ALL_SECTIONS_TOOL = {
+        "name": "emit_report",
+        "description": "Rapportens alla sektioner.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "short_description": {"type": "string", "description": "2-3 meningar om företaget och huvudproblemet."},
+                "lead_magnets_analysis": {"type": "string", "description": "1 stycke om lead magnets."},
+                "forms_analysis": {"type": "string", "description": "1 stycke om formulär."},
+                "cta_analysis": {"type": "string", "description": "1 stycke om CTAs."},
+                "logical_verdict": {"type": "string", "description": "2 stycken hård kritik: 'Ni begår misstaget att...'"},
+                "adjusted_scores": {
+                    "type": "object",
+                    "properties": {
+                        key: {"type": "integer", "minimum": 1, "maximum": 5}
+                        for key in ("value_proposition", "lead_magnets", "form_design",
+                                    "social_proof", "call_to_action", "guiding_content")
+                    },
+                },
+                "criteria_explanations": {
+                    "type": "object",
+                    "properties": {
+                        key: {"type": "string", "description": "1 mening"}
+                        for key in ("value_proposition", "lead_magnets", "form_design",
+                                    "social_proof", "call_to_action", "guiding_content")
+                    },
+                },
+                "summary_assessment": {"type": "string", "description": "2-3 korta punkter om styrkor och svagheter."},
+            },
+            "required": [
+                "short_description", "lead_magnets_analysis", "forms_analysis", "cta_analysis",
+                "logical_verdict", "adjusted_scores", "criteria_explanations", "summary_assessment",
+            ],
+        },
+    }
+
+    # Per-report data for generate_all_sections(), filled with str.format_map()
+    ALL_SECTIONS_PROMPT = """Analysera {company_name} ({industry_label}).
+
+DATA:
+- H1: "{h1}"
+- Subheadline: "{subheadline}"
+- Lead magnets: {lead_magnet_count} st
+- Formulär: {form_count} st
+- CTAs: {ctas}
+- Social proof: {social_proof_count} st
+- Mailto-länkar: {mailto_count} st
+- Öppna PDFs: {ungated_pdf_count} st
+- Problem: {problems}
+
+BETYG att justera (1-5, baserat på kvalitet):
+VP:{score_value_proposition} LM:{score_lead_magnets} Form:{score_form_design} SP:{score_social_proof} CTA:{score_call_to_action} Guide:{score_guiding_content}"""
 
     # ==================== FALLBACK TEMPLATES ====================
 
@@ -360,7 +237,7 @@ TON: Säljande men inte desperat"""
     @staticmethod
     def get_fallback_detailed_analysis(
         category: str,
-        items: List[Dict],
+        items: Sequence[Dict],
         industry_label: str
     ) -> str:
         """
@@ -432,7 +309,7 @@ TON: Säljande men inte desperat"""
     def get_fallback_logical_verdict(
         mailto_count: int,
         ungated_pdf_count: int,
-        missing_elements: List[str]
+        missing_elements: Sequence[str]
     ) -> str:
         """
         Generate logical verdict without AI.
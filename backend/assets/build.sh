@@ -0,0 +1,19 @@
+#!/bin/sh
+# Build the self-hosted report page assets into app/static:
+#   - report.css: Tailwind v3 build of the classes used by app/main.py
+#   - fonts/Geist-*.woff2: Geist Sans from the geist npm package
+# Run from backend/ during deploy (nixpacks.toml, docker/Dockerfile.backend).
+# Needs node/npx; app/main.py falls back to the CDNs if these files are missing.
+set -eu
+
+cd "$(dirname "$0")/.."
+
+npx --yes tailwindcss@3 -c assets/tailwind.config.js -i assets/report.input.css \
+    -o app/static/report.css --minify
+
+tmp="$(mktemp -d)"
+trap 'rm -rf "$tmp"' EXIT
+(cd "$tmp" && npm pack --silent geist@1.2.0 >/dev/null && tar -xzf geist-1.2.0.tgz)
+for weight in Regular Medium SemiBold Bold; do
+    cp "$tmp/package/dist/fonts/geist-sans/Geist-$weight.woff2" app/static/fonts/
+done
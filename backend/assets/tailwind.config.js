@@ -0,0 +1,19 @@
+// Tailwind build for the server-rendered report page (app/main.py).
+// Compiled to app/static/report.css by assets/build.sh at deploy time.
+module.exports = {
+  content: ["./app/main.py", "./app/static/*.js"],
+  theme: {
+    extend: {
+      colors: {
+        primary: {
+          400: "#34d399",
+          500: "#10b981",
+          600: "#059669",
+        },
+      },
+      fontFamily: {
+        sans: ["Geist", "system-ui", "-apple-system", "sans-serif"],
+      },
+    },
+  },
+};
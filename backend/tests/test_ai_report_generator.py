@@ -0,0 +1,50 @@
+"""
+Tests for the low-signal skip in AIReportGenerator.generate_all_sections().
+"""
+import pytest
+
+from app.services.analyzer import ConversionAnalyzer
+from app.services.ai_report_generator import AIReportGenerator
+
+
+class _RecordingClient:
+    """Stands in for AsyncAnthropic and fails the test if Claude is called."""
+
+    def __init__(self):
+        self.messages = self
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        raise AssertionError("Claude should not be called for a low-signal page")
+
+
+def _generator(scraped_data: dict) -> AIReportGenerator:
+    analysis = ConversionAnalyzer(scraped_data).generate_analysis()
+    generator = AIReportGenerator(scraped_data, analysis, "general", 0.0)
+    generator.client = _RecordingClient()
+    return generator
+
+
+@pytest.mark.asyncio
+async def test_empty_page_skips_claude():
+    generator = _generator({})
+    # The analyzer still reports problems for an empty page
+    assert generator.logical_errors
+
+    sections = await generator.generate_all_sections()
+
+    assert generator.client.calls == []
+    assert sections == generator.fallback_sections
+
+
+@pytest.mark.asyncio
+async def test_page_with_content_calls_claude():
+    generator = _generator({
+        "value_proposition": {"h1": "Vi hjälper B2B-bolag växa", "subheadline": "Fler leads på 30 dagar"},
+        "cta_buttons": [{"text": "Boka demo"}],
+    })
+
+    await generator.generate_all_sections()
+
+    assert len(generator.client.calls) == 1
@@ -0,0 +1,36 @@
+"""
+Tests for the single-pass keyword scoring in industry_detector.
+"""
+import re
+from collections import Counter
+
+import pytest
+
+from app.services.industry_detector import (
+    INDUSTRY_TAXONOMY,
+    _check_keyword_prefixes,
+    _score_text,
+)
+
+
+def _score_per_keyword(text: str) -> dict:
+    """Reference scoring: one word-bounded scan per taxonomy keyword."""
+    scores = Counter()
+    for industry, data in INDUSTRY_TAXONOMY.items():
+        for keyword in data["keywords"]:
+            pattern = r"\b" + re.escape(keyword.lower()) + r"\b"
+            weight = 1 + (len(keyword.split()) - 1) * 0.5
+            scores[industry] += len(re.findall(pattern, text)) * weight
+    return {industry: score for industry, score in scores.items() if score}
+
+
+def test_single_pass_matches_per_keyword_scan():
+    keywords = [kw.lower() for data in INDUSTRY_TAXONOMY.values() for kw in data["keywords"]]
+    text = " ".join(keywords) + " " + " och ".join(reversed(keywords))
+
+    assert dict(_score_text(text)) == _score_per_keyword(text)
+
+
+def test_whole_word_prefix_keywords_are_rejected():
+    with pytest.raises(ValueError):
+        _check_keyword_prefixes(["due", "due diligence"])